@@ -0,0 +1,45 @@
+"""
+Measure the per-request cost of token revocation checks in get_current_user.
+
+Run from the repository root:
+    DATABASE_URL=sqlite:///bench.db SECRET_KEY=bench ALGORITHM=HS256 python -m benchmarks.auth_overhead
+"""
+import time
+from datetime import timedelta
+
+from jose import jwt
+from sqlmodel import Session
+
+from src.core.security import revocation_list
+from src.database import engine, init_db
+from src.utils.auth import ALGORITHM, SECRET_KEY, create_access_token, revoke_access_token
+
+ITERATIONS = 20000
+REVOKED_TOKENS = 1000
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / ITERATIONS * 1e6:8.2f} us/op")
+    return elapsed
+
+
+def main():
+    init_db()
+    with Session(engine) as session:
+        for i in range(REVOKED_TOKENS):
+            revoke_access_token(create_access_token({"sub": f"user{i}@example.com"}), session)
+
+        token = create_access_token({"sub": "bench@example.com"}, timedelta(minutes=30))
+        jti = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])["jti"]
+
+        decode = timed("jwt decode", lambda: jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]))
+        check = timed("revocation check (not revoked)", lambda: revocation_list.is_revoked(jti, session))
+        print(f"revocation overhead vs decode: {check / decode * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
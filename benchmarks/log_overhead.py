@@ -0,0 +1,60 @@
+"""
+Measure the caller-side cost of a log call, which is what a request pays.
+
+Compares the queued JSON pipeline in src.core.logging against a plain
+synchronous StreamHandler, both writing to /dev/null.
+
+Run from the repository root:
+    DATABASE_URL=sqlite:///bench.db SECRET_KEY=bench ALGORITHM=HS256 python -m benchmarks.log_overhead
+"""
+import logging
+import os
+import queue
+import time
+from logging.handlers import QueueListener
+
+from src.core.logging import ContextFilter, JSONFormatter, NonBlockingQueueHandler, request_id_var
+
+ITERATIONS = 50000
+
+
+def timed(label: str, logger: logging.Logger, level: int = logging.INFO):
+    start = time.perf_counter()
+    for i in range(ITERATIONS):
+        logger.log(level, "request", extra={"path": "/api/v1/chat", "status": 200, "i": i})
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / ITERATIONS * 1e6:8.2f} us/call")
+
+
+def main():
+    request_id_var.set("bench")
+    with open(os.devnull, "w") as sink:
+        sync_logger = logging.getLogger("bench.sync")
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.DEBUG)
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(JSONFormatter())
+        sync_logger.addHandler(handler)
+        timed("sync StreamHandler", sync_logger)
+
+        queued_logger = logging.getLogger("bench.queued")
+        queued_logger.propagate = False
+        queued_logger.setLevel(logging.DEBUG)
+        stream_handler = logging.StreamHandler(sink)
+        stream_handler.setFormatter(JSONFormatter())
+        queue_handler = NonBlockingQueueHandler(queue.Queue(ITERATIONS))
+        queue_handler.addFilter(ContextFilter(debug_sample_rate=0.01))
+        queued_logger.addHandler(queue_handler)
+        listener = QueueListener(queue_handler.queue, stream_handler)
+        listener.start()
+        timed("queued JSON", queued_logger)
+        # Let the writer drain so the next run isn't competing with it
+        while not queue_handler.queue.empty():
+            time.sleep(0.01)
+        timed("queued JSON, sampled debug", queued_logger, logging.DEBUG)
+        listener.stop()
+        print(f"dropped records: {queue_handler.dropped}")
+
+
+if __name__ == "__main__":
+    main()
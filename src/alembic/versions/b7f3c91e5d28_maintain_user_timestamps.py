@@ -0,0 +1,34 @@
+"""maintain user timestamps
+
+Revision ID: b7f3c91e5d28
+Revises: 8e41c6d0a2f7
+Create Date: 2026-10-19 11:27:05.661492
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3c91e5d28'
+down_revision: Union[str, None] = '8e41c6d0a2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=sa.func.now())
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=None)
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), existing_nullable=False, server_default=None)
@@ -0,0 +1,57 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from src.core.profiling import get_profile_path, list_profiles, profiling_config
+from src.schemas.profiling import ProfileInfo, ProfilingSettings, ProfilingSettingsUpdate
+from src.utils.auth import require_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiling", response_model=ProfilingSettings)
+async def get_profiling_settings():
+    """
+    Get the request profiling settings of the worker handling this request
+    """
+    return {"sample_rate": profiling_config.sample_rate, "routes": profiling_config.routes}
+
+@router.put("/profiling", response_model=ProfilingSettings)
+async def update_profiling_settings(update: ProfilingSettingsUpdate):
+    """
+    Turn request profiling on or off (requires X-Admin-Token)
+    
+    - **sample_rate**: Fraction of matching requests to profile, 0 disables sampling
+    - **routes**: Request paths eligible for profiling, e.g. /api/v1/chat
+    
+    Settings are per worker. Requests carrying a matching X-Profile header are
+    always profiled on eligible routes, regardless of the sample rate.
+    """
+    if update.sample_rate is not None:
+        profiling_config.sample_rate = update.sample_rate
+    if update.routes is not None:
+        profiling_config.routes = update.routes
+    return {"sample_rate": profiling_config.sample_rate, "routes": profiling_config.routes}
+
+@router.get("/profiles", response_model=List[ProfileInfo])
+async def get_profiles():
+    """
+    List captured profiles, newest first
+    
+    Each request produces a .collapsed file (for flamegraph.pl / inferno) and a
+    .speedscope.json file (for https://www.speedscope.app).
+    """
+    return list_profiles()
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str):
+    """
+    Download a captured profile file
+    """
+    path = get_profile_path(name)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, filename=name)
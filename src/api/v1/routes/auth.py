@@ -1,17 +1,26 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status, APIRouter
+from fastapi import Depends, HTTPException, Request, Response, status, APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
 
-from src.crud.user import create_user, get_user_by_email, update_user
+from src.crud.token import revoke_user_refresh_tokens
+from src.crud.user import (
+    create_user,
+    get_user_by_email,
+    get_user_by_id,
+    get_user_version_by_email,
+    update_user
+)
 from src.database import get_session
 from src.models.users import User
 from src.schemas.auth import (
     RegisterIn, 
     RegisterOut, 
+    RefreshRequest,
     Token, 
+    TokenData,
     UserOut, 
     ChangePassword, 
     PasswordResetRequest,
@@ -20,11 +29,18 @@ from src.schemas.auth import (
 from src.utils.auth import (
     authenticate_user, 
     create_access_token, 
+    credentials_exception,
     get_current_active_user,
+    get_token_data,
+    issue_refresh_token,
+    oauth2_scheme,
+    revoke_access_token,
+    rotate_refresh_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     verify_password,
     get_password_hash
 )
+from src.utils.http import is_not_modified, make_etag, not_modified_response, set_cache_validators
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -65,7 +81,7 @@ async def login_for_access_token(
     - **password**: Your password
     
     Returns:
-        Access token for authentication
+        Access token for authentication, and a refresh token for /auth/refresh
     """
     # The username field in OAuth2PasswordRequestForm will contain the email
     email = form_data.username
@@ -80,35 +96,89 @@ async def login_for_access_token(
         )
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    refresh_token, family_id = issue_refresh_token(user.id, session)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "sid": family_id}, expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    refresh_data: RefreshRequest,
+    session: Annotated[Session, Depends(get_session)]
+):
+    """
+    Exchange a refresh token for a new access token
+    
+    - **refresh_token**: The refresh token from login or a previous refresh
+    
+    Refresh tokens are single use: each call returns a new one and invalidates
+    the old. Reusing an old refresh token revokes every token from that login.
+    
+    Returns:
+        A new access token and refresh token
+    """
+    rotated = rotate_refresh_token(refresh_data.refresh_token, session)
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token, family_id = rotated
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.email, "sid": family_id}, expires_delta=access_token_expires
+    )
+    
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 @router.get("/me", response_model=UserOut)
 async def read_users_me(
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    request: Request,
+    response: Response,
+    token_data: Annotated[TokenData, Depends(get_token_data)],
+    session: Annotated[Session, Depends(get_session)]
 ):
     """
     Get current user information
     
     Returns information about the currently authenticated user.
+    Supports If-None-Match / If-Modified-Since: an unchanged profile returns
+    304 without loading the full user row.
     """
-    return current_user
+    version = get_user_version_by_email(token_data.email, session)
+    if not version:
+        raise credentials_exception()
+    user_id, updated_at = version
+    
+    etag = make_etag(user_id, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+    
+    set_cache_validators(response, etag, updated_at)
+    return get_user_by_id(user_id, session)
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    session: Annotated[Session, Depends(get_session)]
+):
     """
-    Logout the current user
+    Logout the current user (requires authentication)
     
-    Note: With JWT tokens, the typical approach is to handle logout on the client side
-    by removing the token from local storage. This endpoint is provided for API
-    completeness and could be extended with a token blacklist system in the future.
+    Adds the access token's id to the server-side revocation list, so the token
+    is rejected on every worker until it would have expired anyway, and revokes
+    the refresh tokens issued with it at login.
     
     Returns:
         A message confirming successful logout
     """
+    revoke_access_token(token, session)
+    
     return {"message": "Successfully logged out"}
 
 @router.post("/change-password")
@@ -123,6 +193,8 @@ async def change_password(
     - **current_password**: The user's current password for verification
     - **new_password**: The new password to set
     
+    Signs out other sessions by revoking all of the user's refresh tokens.
+    
     Returns:
         A message confirming the password change
     """
@@ -136,6 +208,7 @@ async def change_password(
     # Update password
     user_data = {"password": password_data.new_password}
     update_user(current_user.id, user_data, session)
+    revoke_user_refresh_tokens(current_user.id, session)
     
     return {"message": "Password changed successfully"}
 
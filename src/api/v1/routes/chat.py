@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from src.schemas.chat import ChatRequest, StreamingResponse
 from src.utils.llm import get_llm_response
+from src.utils.semantic_cache import chat_cache
 import json
 import asyncio
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
-async def generate_response_stream(messages):
+async def generate_response_stream(messages, cacheable: bool = False):
     """
     Generate a stream of responses to simulate a chat interaction.
     In a real implementation, this would connect to an actual LLM API with streaming.
@@ -16,9 +18,18 @@ async def generate_response_stream(messages):
     user_messages = [msg.content for msg in messages if msg.role == "user"]
     prompt = user_messages[-1] if user_messages else "Hello"
     
-    # Get the initial LLM response (non-streaming in this implementation)
-    # In a production environment, you'd use an API that supports streaming
-    full_response = get_llm_response(prompt)
+    # Paraphrased opening prompts are answered from the semantic cache, which
+    # is shared by every caller; follow-ups depend on their conversation, and
+    # short ones ("continue", "fix it") would match across unrelated users.
+    # Embedding may call out to an API, so it runs off the event loop.
+    full_response, vector = None, None
+    if cacheable:
+        full_response, vector = await run_in_threadpool(chat_cache.get, prompt)
+    if full_response is None:
+        # Get the initial LLM response (non-streaming in this implementation)
+        # In a production environment, you'd use an API that supports streaming
+        full_response = get_llm_response(prompt)
+        chat_cache.put(prompt, full_response, vector)
     
     # Simulate streaming by chunking the response
     chunks = []
@@ -44,7 +55,7 @@ async def chat(request: ChatRequest):
     that can be consumed by the frontend.
     """
     return StreamingResponse(
-        generate_response_stream(request.messages),
+        generate_response_stream(request.messages, cacheable=bool(request.isFirstPrompt)),
         media_type="text/event-stream"
     )
     
\ No newline at end of file
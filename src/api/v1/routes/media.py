@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+
+from src.utils.media import IMMUTABLE_CACHE_CONTROL, get_variant_media_type, get_variant_path
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+@router.get("/{digest}/{variant}")
+async def get_media(digest: str, variant: str):
+    """
+    Serve an uploaded image or one of its thumbnails
+    
+    - **digest**: SHA-256 content hash of the upload
+    - **variant**: "original" or a thumbnail size such as 128
+    
+    Content never changes for a given URL, so responses are cacheable forever.
+    """
+    path = get_variant_path(digest, variant)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media not found"
+        )
+    return FileResponse(
+        path,
+        media_type=get_variant_media_type(path),
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    )
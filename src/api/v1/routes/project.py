@@ -0,0 +1,178 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlmodel import Session
+
+from src.core.exceptions import WorkspaceConflictError, WorkspaceEditError
+from src.crud.project import create_project, get_project
+from src.database import get_session
+from src.models.projects import Project
+from src.models.users import User
+from src.schemas.project import (
+    ProjectChanges,
+    ProjectCreate,
+    ProjectEdits,
+    ProjectFileOut,
+    ProjectOut,
+    ProjectTree
+)
+from src.utils.auth import get_current_active_user
+from src.utils.http import etag_matches, not_modified_response, set_cache_validators
+from src.utils.workspace import (
+    apply_edits,
+    available_templates,
+    get_changes,
+    get_file_hash,
+    get_tree,
+    normalize_path,
+    read_file
+)
+
+router = APIRouter(prefix="/projects", tags=["Projects"])
+
+def project_out(project: Project):
+    """Expose the client's project id rather than the internal row id"""
+    return {
+        "id": project.key,
+        "template": project.template,
+        "version": project.version,
+        "created_at": project.created_at,
+        "updated_at": project.updated_at
+    }
+
+def get_owned_project(
+    project_id: str,
+    session: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_active_user)]
+):
+    """Load a project belonging to the current user, or 404"""
+    project = get_project(current_user.id, project_id, session)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    return project
+
+@router.post("", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)
+async def create_workspace(
+    project_data: ProjectCreate,
+    session: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_active_user)]
+):
+    """
+    Create a project workspace on top of a template (requires authentication)
+    
+    - **id**: The project ID, matching the projectId sent with chat requests
+    - **template**: The base template, one of the bundled templates (e.g. nextjs, react, node)
+    """
+    if project_data.template not in available_templates():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown template"
+        )
+    # The (user_id, key) unique constraint decides, so concurrent creates can't both succeed
+    project = create_project(project_data.id, current_user.id, project_data.template, session)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Project already exists"
+        )
+    
+    return project_out(project)
+
+@router.get("/{project_id}", response_model=ProjectTree)
+async def get_workspace_tree(
+    project: Annotated[Project, Depends(get_owned_project)],
+    session: Annotated[Session, Depends(get_session)]
+):
+    """
+    Get the project's current file tree (requires authentication)
+    
+    Returns each file's path, content hash and size, without content. Clients
+    can compare hashes with what they already hold and fetch only the rest.
+    """
+    return {
+        "id": project.key,
+        "template": project.template,
+        "version": project.version,
+        "files": get_tree(project, session)
+    }
+
+@router.get("/{project_id}/changes", response_model=ProjectChanges)
+async def get_workspace_changes(
+    project: Annotated[Project, Depends(get_owned_project)],
+    session: Annotated[Session, Depends(get_session)]
+):
+    """
+    Get only the files that differ from the base template (requires authentication)
+    
+    Together with the template this reconstructs the full project, so the
+    payload grows with the edits rather than with the template size.
+    """
+    return {
+        "id": project.key,
+        "template": project.template,
+        "version": project.version,
+        "files": get_changes(project, session)
+    }
+
+@router.get("/{project_id}/files/{path:path}", response_model=ProjectFileOut)
+async def get_workspace_file(
+    path: str,
+    request: Request,
+    response: Response,
+    project: Annotated[Project, Depends(get_owned_project)],
+    session: Annotated[Session, Depends(get_session)]
+):
+    """
+    Get a single file's content (requires authentication)
+    
+    The ETag is the content hash; If-None-Match returns 304 without loading content.
+    """
+    try:
+        path = normalize_path(path)
+    except WorkspaceEditError:
+        file_hash = None
+    else:
+        file_hash = get_file_hash(project, path, session)
+    if file_hash is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    etag = f'"{file_hash}"'
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    
+    set_cache_validators(response, etag)
+    return {"path": path, "hash": file_hash, "content": read_file(project, path, file_hash, session)}
+
+@router.patch("/{project_id}/files", response_model=ProjectOut)
+async def edit_workspace_files(
+    edits: ProjectEdits,
+    project: Annotated[Project, Depends(get_owned_project)],
+    session: Annotated[Session, Depends(get_session)]
+):
+    """
+    Apply a batch of file edits as one new project version (requires authentication)
+    
+    - **base_version**: Version the edits were made against; mismatches return 409 (optional)
+    - **edits**: Each with a path and exactly one of:
+      - content: Full new file content
+      - delete: Remove the file
+      - replacements: Search/replace pairs applied in order to the current content
+    """
+    try:
+        return project_out(apply_edits(project, edits.edits, session, base_version=edits.base_version))
+    except WorkspaceConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except WorkspaceEditError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
@@ -1,12 +1,31 @@
 import json
+import re
 from pathlib import Path
 from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
 
+from src.core.logging import logger
 from src.schemas.template import TemplatePrompt
 from src.utils.llm import get_llm_response
+from src.utils.semantic_cache import template_cache
 
 router = APIRouter()
 
+# Framework names a prompt can ask for, mapped to the template they select
+FRAMEWORK_KEYWORDS = {
+    "next": "nextjs",
+    "nextjs": "nextjs",
+    "react": "react",
+    "vite": "react",
+    "node": "node",
+    "nodejs": "node",
+    "express": "node",
+}
+
+def requested_frameworks(text: str):
+    """Templates a prompt asks for by name"""
+    return {FRAMEWORK_KEYWORDS[word] for word in re.findall(r"[a-z]+", text.lower()) if word in FRAMEWORK_KEYWORDS}
+
 @router.post("/template")
 async def template(prompt: TemplatePrompt):
     if not prompt.prompt:
@@ -18,10 +37,23 @@ async def template(prompt: TemplatePrompt):
     {prompt}
     """
     try:
-        template = get_llm_response(messgage)
-        print(template)
-        with open(f"src/templates/{template}.json", "r") as f:
+        # Embeddings barely separate framework names, so a hit has to name the
+        # same framework, and prompts naming several skip the cache entirely
+        frameworks = requested_frameworks(prompt.prompt)
+        name, vector = None, None
+        if len(frameworks) <= 1:
+            name, vector = await run_in_threadpool(
+                template_cache.get, prompt.prompt, lambda cached: requested_frameworks(cached) == frameworks
+            )
+        cached = name is not None
+        if not cached:
+            name = get_llm_response(messgage)
+        logger.info("template selected", extra={"template": name, "cached": cached})
+        with open(f"src/templates/{name}.json", "r") as f:
             template = json.load(f)
+        # Only cache answers that resolved to a real template
+        if not cached:
+            template_cache.put(prompt.prompt, name, vector)
         return {"template": template}
     except Exception as e:
         return {"error": str(e)}
@@ -1,14 +1,17 @@
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Body
 from pydantic import BaseModel
 from sqlmodel import Session
 
-from src.crud.user import get_user_by_id, update_user
+from src.core.exceptions import InvalidImageError, UploadTooLargeError
+from src.crud.user import get_user_by_id, get_user_version, update_user
 from src.database import get_session
 from src.models.users import User
-from src.schemas.auth import UserOut
-from src.utils.auth import get_current_active_user
+from src.schemas.auth import ProfilePictureOut, TokenData, UserOut
+from src.utils.auth import get_current_active_user, get_token_data
+from src.utils.http import is_not_modified, make_etag, not_modified_response, set_cache_validators
+from src.utils.media import save_image_upload, variant_urls
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -36,24 +39,35 @@ async def get_users(
 @router.get("/{user_id}", response_model=UserOut)
 async def get_user(
     user_id: int,
+    request: Request,
+    response: Response,
     session: Annotated[Session, Depends(get_session)],
-    current_user: Annotated[User, Depends(get_current_active_user)]
+    token_data: Annotated[TokenData, Depends(get_token_data)]
 ):
     """
     Get a specific user by ID (requires authentication)
     
     - **user_id**: The ID of the user to retrieve
     
+    Supports If-None-Match / If-Modified-Since: an unchanged profile returns
+    304 without loading the full row of either the caller or the user.
+    
     Returns:
         User object with profile information
     """
-    user = get_user_by_id(user_id, session)
-    if not user:
+    updated_at = get_user_version(user_id, session)
+    if not updated_at:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    
+    etag = make_etag(user_id, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified_response(etag, updated_at)
+    
+    set_cache_validators(response, etag, updated_at)
+    return get_user_by_id(user_id, session)
 
 class UserUpdate(BaseModel):
     name: str | None = None
@@ -62,6 +76,7 @@ class UserUpdate(BaseModel):
 @router.put("/{user_id}", response_model=UserOut)
 async def update_user_profile(
     user_id: int,
+    response: Response,
     session: Annotated[Session, Depends(get_session)],
     current_user: Annotated[User, Depends(get_current_active_user)],
     user_data: UserUpdate = Body(..., description="User data to update")
@@ -93,5 +108,73 @@ async def update_user_profile(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    
+    set_cache_validators(response, make_etag(updated_user.id, updated_user.updated_at), updated_user.updated_at)
     return updated_user
 
+# The body is parsed by hand so it can be streamed, so describe it for the docs
+PROFILE_PICTURE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "JPEG, PNG, GIF or WebP image, up to 5 MB"
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+@router.post("/{user_id}/profile-picture", response_model=ProfilePictureOut, openapi_extra=PROFILE_PICTURE_BODY)
+async def upload_profile_picture(
+    user_id: int,
+    request: Request,
+    session: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_active_user)]
+):
+    """
+    Upload a profile picture (requires authentication)
+    
+    - **user_id**: The ID of the user to update
+    - **file**: The image, sent as multipart/form-data
+    
+    The body is streamed straight to storage and rejected as soon as it passes
+    the size limit. The image is stored by content hash, so identical uploads
+    are kept once, and square thumbnails are generated for each size in the
+    response.
+    
+    Returns:
+        The new profile picture URL and the URLs of its thumbnail variants
+    """
+    if current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this user"
+        )
+    
+    try:
+        digest = await save_image_upload(request)
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except InvalidImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File is not a supported image: {e}"
+        )
+    
+    urls = variant_urls(digest)
+    update_user(user_id, {"profile_picture": urls["original"]}, session)
+    
+    return {"profile_picture": urls["original"], "variants": urls}
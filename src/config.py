@@ -8,8 +8,25 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     google_api_key: str = os.getenv("GOOGLE_API_KEY", "")
     database_url: str = os.getenv("DATABASE_URL", "")
+    database_replica_url: str = os.getenv("DATABASE_REPLICA_URL", "")
+    replica_sticky_seconds: float = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
     secret_key: str = os.getenv("SECRET_KEY", "")  
     algorithm: str = os.getenv("ALGORITHM", "")
+    log_level: str = os.getenv("LOG_LEVEL", "DEBUG")
+    log_debug_sample_rate: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+    admin_token: str = os.getenv("ADMIN_TOKEN", "")
+    profiling_token: str = os.getenv("PROFILING_TOKEN", "")
+    profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    profiling_interval_ms: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "profiles")
+    profile_retention: int = int(os.getenv("PROFILE_RETENTION", "50"))
+    media_dir: str = os.getenv("MEDIA_DIR", "media")
+    image_workers: int = int(os.getenv("IMAGE_WORKERS", "2"))
+    embedding_backend: str = os.getenv("EMBEDDING_BACKEND", "gemini")
+    semantic_cache_size: int = int(os.getenv("SEMANTIC_CACHE_SIZE", "1024"))
+    semantic_cache_threshold: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    semantic_cache_dir: str = os.getenv("SEMANTIC_CACHE_DIR", "cache")
+    semantic_cache_save_seconds: float = float(os.getenv("SEMANTIC_CACHE_SAVE_SECONDS", "300"))
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,14 @@
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class InvalidImageError(Exception):
+    """Raised when uploaded bytes are not a supported image"""
+
+
+class WorkspaceEditError(Exception):
+    """Raised when a project edit cannot be applied to the current tree"""
+
+
+class WorkspaceConflictError(Exception):
+    """Raised when an edit was made against an outdated project version"""
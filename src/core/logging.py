@@ -1,21 +1,151 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from uuid import uuid4
+
+from src.config import settings
+
+# Correlation id of the request being handled, attached to every record
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+LOG_QUEUE_SIZE = 10000
+
+
+class JSONFormatter(logging.Formatter):
+    """Render records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Attach the request id and sample records below INFO.
+
+    Runs on the calling thread before the record is queued, so dropped debug
+    records cost nothing beyond the filter itself.
+    """
+
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.INFO and random.random() >= self.debug_sample_rate:
+            return False
+        record.request_id = request_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the writer falls behind"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so leave formatting to its thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def setup_logger(name: str = "app") -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
 
     if not logger.hasHandlers():
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JSONFormatter())
+
+        # Records are formatted and written by a background thread
+        queue_handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        queue_handler.setLevel(settings.log_level)
+        queue_handler.addFilter(ContextFilter(settings.log_debug_sample_rate))
+        logger.addHandler(queue_handler)
 
-        formatter = logging.Formatter(
-            "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
-        )
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        listener = QueueListener(queue_handler.queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
 
     return logger
 
+async def request_context_middleware(request, call_next):
+    """
+    Tag the request with a correlation id and log its outcome.
+
+    The access line is written once the body has been sent, so streamed
+    responses are timed in full.
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid4().hex
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+
+    def log_request(status: int, error: BaseException | None = None):
+        extra = {
+            "method": request.method,
+            "path": request.url.path,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if error is None:
+            logger.info("request", extra=extra)
+        else:
+            logger.error("request failed", exc_info=error, extra=extra)
+
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        log_request(500, e)
+        raise
+    finally:
+        request_id_var.reset(token)
+
+    response.headers["X-Request-ID"] = request_id
+    body_iterator = response.body_iterator
+
+    async def logged_body():
+        # Runs in the server's context, so restore the id for this request
+        body_token = request_id_var.set(request_id)
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        except Exception as e:
+            log_request(response.status_code, e)
+            raise
+        else:
+            log_request(response.status_code)
+        finally:
+            request_id_var.reset(body_token)
+
+    response.body_iterator = logged_body()
+    return response
+
 # Global logger instance
 logger = setup_logger()
@@ -0,0 +1,245 @@
+import contextvars
+import json
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+import weakref
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from secrets import compare_digest
+from uuid import uuid4
+
+from src.config import settings
+from src.core.logging import logger
+
+PROFILE_HEADER = "X-Profile"
+DEFAULT_PROFILED_ROUTES = ["/api/v1/chat", "/api/v1/template", "/api/v1/auth/login"]
+# Only this many requests are sampled at once, each costs a sampler thread
+MAX_CONCURRENT_PROFILES = 2
+
+# Leaf frames in these files mean the thread is parked, not working
+_IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+_STDLIB = sysconfig.get_paths()["stdlib"]
+# Module path fragments used to attribute samples to a subsystem
+_CATEGORIES = {
+    "db": ("sqlalchemy", "sqlmodel", "sqlite3", "psycopg"),
+    "llm": ("google/genai", "httpx", "httpcore"),
+    "bcrypt": ("bcrypt", "passlib"),
+}
+
+
+class ProfilingConfig:
+    """Runtime profiling settings for this worker, adjustable from the admin API"""
+
+    def __init__(self):
+        self.sample_rate = settings.profiling_sample_rate
+        self.routes = list(DEFAULT_PROFILED_ROUTES)
+        self.interval = settings.profiling_interval_ms / 1000
+        self.output_dir = Path(settings.profile_dir)
+        self.max_profiles = settings.profile_retention
+
+
+class StackSampler:
+    """
+    Sample the Python stacks of every busy thread at a fixed interval.
+
+    Requests share the event loop and threadpool, so a profile taken while
+    other requests are in flight also contains their stacks.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        filename = code.co_filename
+        if "site-packages" in filename:
+            filename = filename.split("site-packages" + os.sep, 1)[1]
+        elif filename.startswith(_STDLIB):
+            filename = os.path.relpath(filename, _STDLIB)
+        elif filename.startswith(os.getcwd()):
+            filename = os.path.relpath(filename)
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame))
+                    frame = frame.f_back
+                self.samples[tuple(reversed(stack))] += 1
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        # A finalizer can fire on the sampler thread itself during garbage collection
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def collapsed(self) -> str:
+        """Render samples in the collapsed-stack format used by flamegraph.pl"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.items())
+
+    def speedscope(self, name: str) -> dict:
+        """Render samples as a speedscope sampled profile"""
+        frames: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.items():
+            samples.append([frames.setdefault(label, len(frames)) for label in stack])
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "webud",
+        }
+
+    def breakdown(self) -> dict[str, float]:
+        """Estimated seconds spent in each subsystem"""
+        totals = dict.fromkeys(_CATEGORIES, 0.0)
+        for stack, count in self.samples.items():
+            joined = ";".join(stack)
+            for category, fragments in _CATEGORIES.items():
+                if any(fragment in joined for fragment in fragments):
+                    totals[category] += count * self.interval
+        return totals
+
+
+profiling_config = ProfilingConfig()
+_profile_slots = threading.BoundedSemaphore(MAX_CONCURRENT_PROFILES)
+_prune_lock = threading.Lock()
+
+
+def _should_profile(request) -> bool:
+    if request.url.path not in profiling_config.routes:
+        return False
+    header = request.headers.get(PROFILE_HEADER)
+    if header and settings.profiling_token:
+        return compare_digest(header, settings.profiling_token)
+    return random.random() < profiling_config.sample_rate
+
+
+def _prune_profiles():
+    """Delete the oldest captures beyond the retention limit"""
+    with _prune_lock:
+        files = sorted(
+            (path for path in profiling_config.output_dir.iterdir() if path.is_file()),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        # Each capture writes a .collapsed and a .speedscope.json file
+        for path in files[profiling_config.max_profiles * 2:]:
+            path.unlink(missing_ok=True)
+
+
+def _write_profile(sampler: StackSampler, request) -> str:
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{request.url.path.strip('/').replace('/', '_')}-{uuid4().hex[:8]}"
+    profiling_config.output_dir.mkdir(parents=True, exist_ok=True)
+    (profiling_config.output_dir / f"{name}.collapsed").write_text(sampler.collapsed())
+    (profiling_config.output_dir / f"{name}.speedscope.json").write_text(json.dumps(sampler.speedscope(name)))
+    _prune_profiles()
+    logger.info(
+        "profile captured",
+        extra={
+            "profile": name,
+            "path": request.url.path,
+            "duration_ms": round(sampler.duration * 1000, 2),
+            "breakdown": sampler.breakdown(),
+        },
+    )
+    return name
+
+
+async def profiling_middleware(request, call_next):
+    """Profile sampled requests to the configured routes, including streamed bodies"""
+    if not _should_profile(request) or not _profile_slots.acquire(blocking=False):
+        return await call_next(request)
+
+    sampler = StackSampler(profiling_config.interval)
+    sampler.start()
+    finish_lock = threading.Lock()
+    finished = False
+
+    def finish():
+        # Runs from whichever of the body's finally or its finalizer comes first
+        nonlocal finished
+        with finish_lock:
+            if finished:
+                return
+            finished = True
+        sampler.stop()
+        _profile_slots.release()
+        # Keep file writes off the event loop, logging with this request's id
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(_write_profile, sampler, request), daemon=True).start()
+
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish()
+        raise
+
+    body_iterator = response.body_iterator
+
+    async def profiled_body():
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            finish()
+
+    response.body_iterator = profiled_body()
+    # A body that is never iterated skips its finally, so also finish when it is collected
+    weakref.finalize(response.body_iterator, finish)
+    return response
+
+
+def list_profiles() -> list[dict]:
+    """Captured profile files, newest first"""
+    if not profiling_config.output_dir.is_dir():
+        return []
+    files = sorted(profiling_config.output_dir.iterdir(), key=lambda path: path.stat().st_mtime, reverse=True)
+    return [
+        {
+            "name": path.name,
+            "size": path.stat().st_size,
+            "created_at": datetime.fromtimestamp(path.stat().st_mtime),
+        }
+        for path in files
+        if path.is_file()
+    ]
+
+
+def get_profile_path(name: str) -> Path | None:
+    """Resolve a profile file name inside the output directory"""
+    path = (profiling_config.output_dir / name).resolve()
+    if path.parent != profiling_config.output_dir.resolve() or not path.is_file():
+        return None
+    return path
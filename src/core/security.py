@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from src.crud.token import (
+    delete_expired_refresh_tokens,
+    delete_expired_revoked_tokens,
+    get_revoked_tokens_since,
+    is_token_revoked,
+    revoke_token,
+)
+from src.database import maintenance_writes, use_primary
+
+# How often each worker pulls revocations made by other workers
+REVOCATION_SYNC_SECONDS = 5
+# How often expired revocations and refresh tokens are pruned and the filter is rebuilt
+REVOCATION_PRUNE_SECONDS = 600
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys.
+
+    Membership checks cost a single blake2b digest and a handful of bit
+    lookups regardless of how many keys have been added. False positives
+    are possible, false negatives are not.
+    """
+
+    def __init__(self, size_bits: int = 1 << 20, hash_count: int = 4):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray(size_bits // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.hash_count).digest()
+        for i in range(self.hash_count):
+            yield int.from_bytes(digest[4 * i:4 * i + 4], "little") % self.size_bits
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocationList:
+    """
+    In-memory front for the revoked_token table.
+
+    A Bloom filter answers the common "not revoked" case without touching
+    the database; filter hits are confirmed against the table so false
+    positives never reject a valid token. Each worker periodically pulls
+    rows revoked elsewhere, and expired rows (along with expired refresh
+    tokens) are pruned on a slower cadence, rebuilding the filter so it
+    doesn't saturate.
+    """
+
+    def __init__(
+        self,
+        sync_seconds: float = REVOCATION_SYNC_SECONDS,
+        prune_seconds: float = REVOCATION_PRUNE_SECONDS,
+    ):
+        self.sync_seconds = sync_seconds
+        self.prune_seconds = prune_seconds
+        self._filter = BloomFilter()
+        self._lock = threading.Lock()
+        self._last_sync: float | None = None
+        self._last_sync_at: datetime | None = None
+        self._last_prune = time.monotonic()
+
+    def _sync(self, session: Session):
+        now = time.monotonic()
+        if self._last_sync is not None and now - self._last_sync < self.sync_seconds:
+            return
+
+        with self._lock:
+            if self._last_sync is not None and now - self._last_sync < self.sync_seconds:
+                return
+
+            started_at = datetime.utcnow()
+            # Read from the primary: the window only moves forward, so rows a
+            # lagging replica hasn't received yet would never be picked up
+            with use_primary(session):
+                if now - self._last_prune >= self.prune_seconds:
+                    # Pruning rides on whichever request comes along; it isn't that client's write
+                    with maintenance_writes(session):
+                        delete_expired_revoked_tokens(session)
+                        delete_expired_refresh_tokens(session)
+                    self._filter = BloomFilter()
+                    self._last_sync_at = None
+                    self._last_prune = now
+
+                # Overlap the window by one interval to tolerate clock skew between workers
+                since = None
+                if self._last_sync_at is not None:
+                    since = self._last_sync_at - timedelta(seconds=self.sync_seconds)
+                for jti in get_revoked_tokens_since(since, session):
+                    self._filter.add(jti)
+
+            self._last_sync = now
+            self._last_sync_at = started_at
+
+    def revoke(self, jti: str, expires_at: datetime, session: Session):
+        """Persist a revocation and make it visible to this worker immediately"""
+        revoke_token(jti, expires_at, session)
+        self._filter.add(jti)
+
+    def is_revoked(self, jti: str, session: Session) -> bool:
+        """Check whether a token id has been revoked"""
+        self._sync(session)
+        if jti not in self._filter:
+            return False
+        # Filter hits are rare; confirm them without replica lag
+        with use_primary(session):
+            return is_token_revoked(jti, session)
+
+
+# Global revocation list instance
+revocation_list = TokenRevocationList()
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, select, update
+from src.models.projects import Project, ProjectBlob, ProjectFile
+
+def create_project(key: str, user_id: int, template: str, session: Session):
+    """Create an empty project on top of a template, or return None if the user already has one with this key"""
+    project = Project(key=key, user_id=user_id, template=template)
+    session.add(project)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return None
+    session.refresh(project)
+
+    return project
+
+def get_project(user_id: int, key: str, session: Session):
+    """Get one of a user's projects by the id the client gave it"""
+    return session.exec(select(Project).where(Project.user_id == user_id, Project.key == key)).first()
+
+def get_project_files(project_id: int, session: Session):
+    """Get the files a project changes relative to its template"""
+    return session.exec(select(ProjectFile).where(ProjectFile.project_id == project_id)).all()
+
+def get_project_file(project_id: int, path: str, session: Session):
+    """Get a single changed file, without its content"""
+    return session.get(ProjectFile, (project_id, path))
+
+def get_blob_contents(hashes: list[str], session: Session):
+    """Get file contents keyed by hash"""
+    if not hashes:
+        return {}
+    rows = session.exec(select(ProjectBlob.hash, ProjectBlob.content).where(ProjectBlob.hash.in_(hashes))).all()
+    return dict(rows)
+
+def _add_blob_ref(blob_hash: str, content: str, session: Session):
+    added = session.exec(
+        update(ProjectBlob).where(ProjectBlob.hash == blob_hash).values(refs=ProjectBlob.refs + 1)
+    )
+    if added.rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.add(ProjectBlob(hash=blob_hash, content=content, refs=1))
+    except IntegrityError:
+        # Another transaction stored the same content first
+        session.exec(update(ProjectBlob).where(ProjectBlob.hash == blob_hash).values(refs=ProjectBlob.refs + 1))
+
+def _release_blob_ref(blob_hash: str, session: Session):
+    session.exec(update(ProjectBlob).where(ProjectBlob.hash == blob_hash).values(refs=ProjectBlob.refs - 1))
+
+def save_project_changes(project: Project, changes: dict, expected_version: int, session: Session):
+    """
+    Write a set of changes to a project as the version after `expected_version`.
+
+    `changes` maps path -> (blob_hash, content, size), or None when the path
+    now matches the template and no longer needs a row. A None blob_hash
+    marks a deleted template file. Returns None without writing anything if
+    the project is no longer at `expected_version`.
+
+    The version is bumped with a conditional UPDATE before any file is
+    written, so concurrent edits serialize on the project row. Blobs are
+    reference counted in the same way and deleted once nothing points at them.
+    """
+    now = datetime.utcnow()
+    bumped = session.exec(
+        update(Project)
+        .where(Project.id == project.id, Project.version == expected_version)
+        .values(version=Project.version + 1, updated_at=now)
+    )
+    if bumped.rowcount != 1:
+        session.rollback()
+        return None
+
+    released = set()
+    for path, change in changes.items():
+        existing = session.get(ProjectFile, (project.id, path))
+        if existing and change and existing.blob_hash == change[0]:
+            continue
+        if existing and existing.blob_hash:
+            _release_blob_ref(existing.blob_hash, session)
+            released.add(existing.blob_hash)
+
+        if change is None:
+            if existing:
+                session.delete(existing)
+            continue
+
+        blob_hash, content, size = change
+        if blob_hash:
+            _add_blob_ref(blob_hash, content, session)
+        if existing:
+            existing.blob_hash = blob_hash
+            existing.size = size
+            existing.updated_at = now
+            session.add(existing)
+        else:
+            session.add(ProjectFile(project_id=project.id, path=path, blob_hash=blob_hash, size=size, updated_at=now))
+
+    if released:
+        session.flush()
+        session.exec(delete(ProjectBlob).where(ProjectBlob.hash.in_(released), ProjectBlob.refs <= 0))
+
+    session.commit()
+    session.refresh(project)
+
+    return project
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, select, update
+from src.models.tokens import RefreshToken, RevokedToken
+
+def revoke_token(jti: str, expires_at: datetime, session: Session):
+    """Add a token id to the revocation list"""
+    revoked = session.get(RevokedToken, jti)
+    if revoked:
+        return revoked
+
+    revoked = RevokedToken(jti=jti, expires_at=expires_at)
+    session.add(revoked)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent request revoked the same token first
+        session.rollback()
+        return session.get(RevokedToken, jti)
+    session.refresh(revoked)
+
+    return revoked
+
+def is_token_revoked(jti: str, session: Session):
+    """Check the database for a revoked token id"""
+    return session.get(RevokedToken, jti) is not None
+
+def get_revoked_tokens_since(since: datetime | None, session: Session):
+    """Get the ids of unexpired tokens revoked after the given time"""
+    statement = select(RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+    if since is not None:
+        statement = statement.where(RevokedToken.revoked_at >= since)
+    return session.exec(statement).all()
+
+def delete_expired_revoked_tokens(session: Session):
+    """Remove revocation entries whose tokens have expired anyway"""
+    result = session.exec(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    session.commit()
+    return result.rowcount
+
+def create_refresh_token(user_id: int, token_hash: str, family_id: str, expires_at: datetime, session: Session):
+    """Store a new refresh token by its hash"""
+    refresh_token = RefreshToken(
+        token_hash=token_hash,
+        family_id=family_id,
+        user_id=user_id,
+        expires_at=expires_at
+    )
+    session.add(refresh_token)
+    session.commit()
+    session.refresh(refresh_token)
+
+    return refresh_token
+
+def get_refresh_token_by_hash(token_hash: str, session: Session):
+    """Get a refresh token by its hash"""
+    return session.exec(select(RefreshToken).where(RefreshToken.token_hash == token_hash)).first()
+
+def revoke_refresh_token(refresh_token: RefreshToken, session: Session):
+    """
+    Mark a single refresh token as used.
+
+    Only succeeds for the one caller that flips it from live to revoked, so
+    concurrent rotations of the same token can't both win.
+    """
+    result = session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.id == refresh_token.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    session.commit()
+
+    return result.rowcount == 1
+
+def revoke_refresh_token_family(family_id: str, session: Session):
+    """Revoke every live refresh token descended from the same login"""
+    session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    session.commit()
+
+def revoke_user_refresh_tokens(user_id: int, session: Session):
+    """Revoke every live refresh token belonging to a user"""
+    session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    session.commit()
+
+def delete_expired_refresh_tokens(session: Session, batch_size: int = 500):
+    """Remove expired refresh tokens, committing in batches to keep locks short"""
+    deleted = 0
+    while True:
+        ids = session.exec(
+            select(RefreshToken.id).where(RefreshToken.expires_at <= datetime.utcnow()).limit(batch_size)
+        ).all()
+        if not ids:
+            return deleted
+        session.exec(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+        session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return deleted
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlmodel import Session, select
 from src.models.users import User
 from src.schemas.auth import RegisterIn
@@ -30,6 +32,14 @@ def get_user_by_id(user_id: int, session: Session):
     """Get a user by ID"""
     return session.get(User, user_id)
 
+def get_user_version(user_id: int, session: Session):
+    """Get only a user's last modification time, for cache validation"""
+    return session.exec(select(User.updated_at).where(User.id == user_id)).first()
+
+def get_user_version_by_email(email: str, session: Session):
+    """Get only a user's id and last modification time by email"""
+    return session.exec(select(User.id, User.updated_at).where(User.email == email)).first()
+
 def update_user(user_id: int, user_data: dict, session: Session):
     """Update user information"""
     user = get_user_by_id(user_id, session)
@@ -40,6 +50,7 @@ def update_user(user_id: int, user_data: dict, session: Session):
         if key == "password" and value:
             value = get_password_hash(value)
         setattr(user, key, value)
+    user.updated_at = datetime.utcnow()
     
     session.add(user)
     session.commit()
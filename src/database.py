@@ -1,10 +1,133 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import Delete, Insert, Update, event
 from sqlmodel import create_engine, SQLModel, Session
 from src.config import settings
 
 engine = create_engine(settings.database_url)
+replica_engine = create_engine(settings.database_replica_url) if settings.database_replica_url else engine
+
+# Requests with these methods may read from the replica
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Time of the client's last committed write, sent back as a header for API
+# clients and a cookie for browsers. It travels with the client, so every
+# worker pins that client's reads to the primary.
+LAST_WRITE_HEADER = "X-Last-Write"
+LAST_WRITE_COOKIE = "last_write"
+# Collects the commit time of writes made while handling the current request
+_request_writes: ContextVar[dict | None] = ContextVar("request_writes", default=None)
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica when it is safe to.
+
+    Reads go to the replica only in read-only requests, and only until the
+    session writes anything or is pinned to the primary; every write goes to
+    the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.info.get("read_only")
+            and not self.info.get("primary")
+            and not self.info.get("wrote")
+            and not self._flushing
+            and not isinstance(clause, (Insert, Update, Delete))
+        ):
+            return replica_engine
+        return engine
+
+def _mark_write(session):
+    session.info["wrote"] = True
+    if not session.info.get("maintenance"):
+        session.info["client_wrote"] = True
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush(session, flush_context):
+    _mark_write(session)
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _mark_write(orm_execute_state.session)
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_write(session):
+    if session.info.get("client_wrote"):
+        committed = _request_writes.get()
+        if committed is not None:
+            committed["at"] = time.time()
+
+def wrote_recently(request: Request):
+    """
+    Whether the client committed a write within the sticky window.
+
+    The time comes from the X-Last-Write header or the last_write cookie.
+    Those clients read from the primary, so they never see replica lag on
+    their own changes.
+    """
+    last_write = 0.0
+    for value in (request.headers.get(LAST_WRITE_HEADER), request.cookies.get(LAST_WRITE_COOKIE)):
+        try:
+            last_write = max(last_write, float(value or 0))
+        except ValueError:
+            pass
+    return time.time() - last_write < settings.replica_sticky_seconds
+
+async def last_write_middleware(request: Request, call_next):
+    """
+    Tell clients when their request committed a write.
+
+    Runs outside the handler, so the marker also reaches responses the
+    handler built itself and error responses from HTTPException.
+    """
+    committed = {}
+    token = _request_writes.set(committed)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_writes.reset(token)
+
+    if "at" in committed:
+        value = f"{committed['at']:.3f}"
+        response.headers[LAST_WRITE_HEADER] = value
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            value,
+            max_age=max(1, int(settings.replica_sticky_seconds)),
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
+@contextmanager
+def maintenance_writes(session: Session):
+    """Writes inside the block are housekeeping, not the client's, and don't pin its reads"""
+    previous = session.info.get("maintenance")
+    session.info["maintenance"] = True
+    try:
+        yield session
+    finally:
+        session.info["maintenance"] = previous
+
+@contextmanager
+def use_primary(session: Session):
+    """Route the session's reads to the primary inside the block"""
+    previous = session.info.get("primary")
+    session.info["primary"] = True
+    try:
+        yield session
+    finally:
+        session.info["primary"] = previous
 
-def get_session():
-    with Session(engine) as session:
+def get_session(request: Request):
+    with RoutingSession() as session:
+        session.info["read_only"] = request.method in READ_ONLY_METHODS
+        session.info["primary"] = wrote_recently(request)
         yield session
 
 def init_db():
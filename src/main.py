@@ -1,7 +1,14 @@
+import asyncio
+
 from fastapi import FastAPI
-from src.api.v1.routes import auth, template, chat, user
+from src.config import settings
+from src.api.v1.routes import admin, auth, media, project, template, chat, user
 from fastapi.middleware.cors import CORSMiddleware
-from src.database import init_db
+from src.core.logging import request_context_middleware
+from src.core.profiling import profiling_middleware
+from src.database import LAST_WRITE_HEADER, init_db, last_write_middleware
+from src.utils.media import shutdown_process_pool
+from src.utils.semantic_cache import autosave_caches, save_caches
 
 # Create FastAPI app with enhanced documentation
 app = FastAPI(
@@ -28,6 +35,18 @@ app = FastAPI(
             "name": "Chat",
             "description": "Operations related to chat functionality",
         },
+        {
+            "name": "Projects",
+            "description": "Operations related to project workspaces",
+        },
+        {
+            "name": "Media",
+            "description": "Uploaded images and their thumbnails",
+        },
+        {
+            "name": "Admin",
+            "description": "Operational endpoints such as request profiling, guarded by X-Admin-Token",
+        },
     ]
 )
 
@@ -36,6 +55,9 @@ app.include_router(auth.router, prefix="/api/v1")
 app.include_router(user.router, prefix="/api/v1")
 app.include_router(template.router, prefix="/api/v1")
 app.include_router(chat.router, prefix="/api/v1")
+app.include_router(project.router, prefix="/api/v1")
+app.include_router(media.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
 
 # CORS middleware
 app.add_middleware(
@@ -44,12 +66,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cross-origin clients need to read it to send it back
+    expose_headers=[LAST_WRITE_HEADER],
 )
 
+# Read-your-writes markers, on-demand request profiling, then correlation ids and access logging
+app.middleware("http")(last_write_middleware)
+app.middleware("http")(profiling_middleware)
+app.middleware("http")(request_context_middleware)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def on_startup():
     init_db()
+    app.state.cache_autosave = None
+    if settings.semantic_cache_dir and settings.semantic_cache_save_seconds > 0:
+        app.state.cache_autosave = asyncio.create_task(autosave_caches(settings.semantic_cache_save_seconds))
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    shutdown_process_pool()
+    if app.state.cache_autosave:
+        app.state.cache_autosave.cancel()
+    save_caches()
 
 @app.get("/")
 async def root():
@@ -1,3 +1,5 @@
 from .users import User
+from .tokens import RevokedToken, RefreshToken
+from .projects import Project, ProjectFile, ProjectBlob
 
-__all__ = ["User"]
\ No newline at end of file
+__all__ = ["User", "RevokedToken", "RefreshToken", "Project", "ProjectFile", "ProjectBlob"]
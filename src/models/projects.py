@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+class Project(SQLModel, table=True):
+    """
+    `key` is the client's project id, unique per user rather than globally.
+    Timestamps are naive UTC.
+    """
+    __table_args__ = (UniqueConstraint("user_id", "key"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    key: str
+    template: str
+    version: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ProjectFile(SQLModel, table=True):
+    """A file that differs from the project's base template; a null blob_hash marks a deleted template file"""
+    __tablename__ = "project_file"
+
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    path: str = Field(primary_key=True)
+    blob_hash: str | None = Field(default=None, foreign_key="project_blob.hash", index=True)
+    size: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ProjectBlob(SQLModel, table=True):
+    """File content keyed by its SHA-256, shared by every project that contains it"""
+    __tablename__ = "project_blob"
+
+    hash: str = Field(primary_key=True)
+    content: str
+    # Number of project_file rows pointing at this blob
+    refs: int = 0
@@ -1,11 +1,19 @@
 from datetime import datetime
+from sqlalchemy import func
 from sqlmodel import Field, SQLModel
 
 class User(SQLModel, table=True):
+    """Timestamps are naive UTC, matching func.now() on the database side"""
     id: int | None = Field(default=None, primary_key=True)
     name: str
     email: str
     password: str
     profile_picture: str | None = None
-    created_at: datetime = Field(default=datetime.now())
-    updated_at: datetime = Field(default=datetime.now())
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": datetime.utcnow}
+    )
@@ -23,6 +23,10 @@ class LoginOut(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: str | None = None
@@ -34,6 +38,10 @@ class UserOut(BaseModel):
     profile_picture: str | None = None
     created_at: datetime.datetime
 
+class ProfilePictureOut(BaseModel):
+    profile_picture: str
+    variants: dict[str, str]
+
 class PasswordResetRequest(BaseModel):
     email: EmailStr
 
@@ -0,0 +1,15 @@
+import datetime
+from pydantic import BaseModel, Field
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float = Field(ge=0, le=1)
+    routes: list[str]
+
+class ProfilingSettingsUpdate(BaseModel):
+    sample_rate: float | None = Field(default=None, ge=0, le=1)
+    routes: list[str] | None = None
+
+class ProfileInfo(BaseModel):
+    name: str
+    size: int
+    created_at: datetime.datetime
@@ -0,0 +1,63 @@
+import datetime
+from pydantic import BaseModel, Field, model_validator
+
+class ProjectCreate(BaseModel):
+    id: str = Field(min_length=1, max_length=100)
+    template: str
+
+class ProjectOut(BaseModel):
+    id: str
+    template: str
+    version: int
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+class TreeEntry(BaseModel):
+    path: str
+    hash: str
+    size: int
+
+class ProjectTree(BaseModel):
+    id: str
+    template: str
+    version: int
+    files: list[TreeEntry]
+
+class FileChange(BaseModel):
+    path: str
+    hash: str | None = None
+    content: str | None = None
+
+class ProjectChanges(BaseModel):
+    """Files that differ from the base template; a change without a hash is a deletion"""
+    id: str
+    template: str
+    version: int
+    files: list[FileChange]
+
+class ProjectFileOut(BaseModel):
+    path: str
+    hash: str
+    content: str
+
+class Replacement(BaseModel):
+    search: str = Field(min_length=1)
+    replace: str
+
+class FileEdit(BaseModel):
+    """Exactly one of content, delete or replacements"""
+    path: str
+    content: str | None = None
+    delete: bool = False
+    replacements: list[Replacement] | None = None
+
+    @model_validator(mode="after")
+    def check_single_operation(self):
+        operations = [self.content is not None, self.delete, bool(self.replacements)]
+        if sum(operations) != 1:
+            raise ValueError("Provide exactly one of content, delete or replacements")
+        return self
+
+class ProjectEdits(BaseModel):
+    base_version: int | None = None
+    edits: list[FileEdit] = Field(min_length=1)
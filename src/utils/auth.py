@@ -1,13 +1,23 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta
 from typing import Annotated, Union
+from uuid import uuid4
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
 
 from src.config import settings
+from src.core.security import revocation_list
+from src.crud.token import (
+    create_refresh_token,
+    get_refresh_token_by_hash,
+    revoke_refresh_token,
+    revoke_refresh_token_family,
+)
 from src.database import get_session
 from src.models.users import User
 from src.schemas.auth import TokenData
@@ -22,6 +32,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 def verify_password(plain_password, hashed_password):
     """Verify if the provided password matches the hashed password"""
@@ -47,33 +58,113 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_session)]
-):
-    """Get the current authenticated user from the JWT token"""
-    credentials_exception = HTTPException(
+def hash_refresh_token(token: str):
+    """Hash a refresh token for storage; tokens are random, so a fast hash is enough"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_refresh_token(user_id: int, db: Session, family_id: Union[str, None] = None):
+    """
+    Create an opaque refresh token, starting a new family unless one is given.
+
+    Returns the token and its family id; access tokens issued alongside carry
+    the family id as their `sid` claim so logout can revoke the family.
+    """
+    token = secrets.token_urlsafe(32)
+    family_id = family_id or uuid4().hex
+    create_refresh_token(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        session=db
+    )
+    return token, family_id
+
+def rotate_refresh_token(token: str, db: Session):
+    """
+    Exchange a refresh token for its successor in the same family.
+
+    Presenting a token that was already rotated means it leaked, so the
+    whole family is revoked. Returns the user, the new refresh token and the
+    family id, or None if the token is unknown, expired, or reused.
+    """
+    refresh_token = get_refresh_token_by_hash(hash_refresh_token(token), db)
+    if not refresh_token:
+        return None
+    if refresh_token.revoked_at is not None:
+        revoke_refresh_token_family(refresh_token.family_id, db)
+        return None
+    if refresh_token.expires_at <= datetime.utcnow():
+        return None
+
+    user = db.get(User, refresh_token.user_id)
+    if not user:
+        return None
+
+    if not revoke_refresh_token(refresh_token, db):
+        # Another request rotated this token first
+        revoke_refresh_token_family(refresh_token.family_id, db)
+        return None
+    new_token, family_id = issue_refresh_token(user.id, db, family_id=refresh_token.family_id)
+    return user, new_token, family_id
+
+def revoke_access_token(token: str, db: Session):
+    """Revoke a JWT access token until it expires, along with its refresh token family"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+
+    jti = payload.get("jti")
+    exp = payload.get("exp")
+    if jti is None or exp is None:
+        return False
+
+    revocation_list.revoke(jti, datetime.utcfromtimestamp(exp), db)
+    sid = payload.get("sid")
+    if sid is not None:
+        revoke_refresh_token_family(sid, db)
+    return True
+
+def credentials_exception():
+    """Build the 401 raised for any invalid or unknown credentials"""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+async def get_token_data(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Validate the JWT token without loading the user"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise credentials_exception()
         token_data = TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-        
+        raise credentials_exception()
+
+    jti = payload.get("jti")
+    if jti is not None and revocation_list.is_revoked(jti, db):
+        raise credentials_exception()
+    return token_data
+
+async def get_current_user(
+    token_data: Annotated[TokenData, Depends(get_token_data)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Get the current authenticated user from the JWT token"""
     user = db.exec(select(User).where(User.email == token_data.email)).first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
     return user
 
 async def get_current_active_user(
@@ -82,4 +173,14 @@ async def get_current_active_user(
     """Check if the current user is active"""
     # If you add an 'is_active' field to your User model,
     # you can check that here
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+async def require_admin(
+    x_admin_token: Annotated[Union[str, None], Header()] = None
+):
+    """Check the shared admin token; admin endpoints are disabled when none is configured"""
+    if not settings.admin_token or not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+def _as_utc(value: datetime):
+    # Stored timestamps are naive UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def make_etag(resource_id: int, updated_at: datetime):
+    """Build an ETag from a row's id and last modification time"""
+    return f'"{resource_id}-{int(_as_utc(updated_at).timestamp() * 1_000_000)}"'
+
+def format_last_modified(updated_at: datetime):
+    """Format a naive UTC timestamp as an HTTP date"""
+    return format_datetime(_as_utc(updated_at), usegmt=True)
+
+def etag_matches(request: Request, etag: str):
+    """
+    Whether If-None-Match lists the current ETag.
+
+    Uses weak comparison, as RFC 9110 requires for GET.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+def is_not_modified(request: Request, etag: str, updated_at: datetime):
+    """Evaluate If-None-Match, falling back to If-Modified-Since"""
+    if "if-none-match" in request.headers:
+        return etag_matches(request, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return _as_utc(updated_at).replace(microsecond=0) <= since
+
+    return False
+
+def set_cache_validators(response: Response, etag: str, updated_at: datetime | None = None):
+    """Attach validators so clients revalidate instead of refetching"""
+    response.headers["ETag"] = etag
+    if updated_at is not None:
+        response.headers["Last-Modified"] = format_last_modified(updated_at)
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def not_modified_response(etag: str, updated_at: datetime | None = None):
+    """Build an empty 304 response carrying the current validators"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_validators(response, etag, updated_at)
+    return response
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import Request
+from multipart.multipart import MultipartParser, parse_options_header
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+
+from src.config import settings
+from src.core.exceptions import InvalidImageError, UploadTooLargeError
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+# Allowance for multipart boundaries, part headers and small extra fields
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+THUMBNAIL_SIZES = (64, 128, 256)
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+# Long-lived caching is safe because paths are content addressed
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+_process_pool: ProcessPoolExecutor | None = None
+
+def get_process_pool():
+    """Lazily start the pool used for image work, keeping it off the event loop"""
+    global _process_pool
+    if _process_pool is None:
+        # Spawn rather than fork: forking a process that already runs logging,
+        # threadpool and sampler threads can deadlock the child on a held lock
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.image_workers or None,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+def media_dir(digest: str):
+    """Directory holding an upload and its variants"""
+    return Path(settings.media_dir) / digest[:2] / digest
+
+class _UploadParser:
+    """
+    Stream a multipart body, writing the `file` part to a temp file.
+
+    Callbacks run synchronously inside MultipartParser.write; file bytes are
+    hashed as they arrive and buffered only until the caller flushes them.
+    """
+
+    def __init__(self, boundary: bytes, field: str):
+        self.field = field.encode()
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.found = False
+        self.pending: list[bytes] = []
+        self._in_file = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict[bytes, bytes] = {}
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        # Only the first part with the expected name is kept
+        self._in_file = not self.found and options.get(b"name") == self.field
+        self.found = self.found or self._in_file
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_file:
+            return
+        chunk = data[start:end]
+        self.size += len(chunk)
+        if self.size > MAX_UPLOAD_BYTES:
+            raise UploadTooLargeError(f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+        self.sha256.update(chunk)
+        self.pending.append(chunk)
+
+    def _on_part_end(self):
+        self._in_file = False
+
+    def flush(self):
+        data = b"".join(self.pending)
+        self.pending.clear()
+        return data
+
+def _commit_upload(tmp_name: str, digest: str):
+    """Move a finished upload into place, returning whether this call created it"""
+    target = media_dir(digest) / "original"
+    if target.exists():
+        os.unlink(tmp_name)
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_name, target)
+    return True
+
+async def receive_upload(request: Request, field: str = "file"):
+    """
+    Stream a multipart upload into content-addressed storage.
+
+    The body is parsed as it arrives and never held in memory; the size limit
+    is checked against Content-Length up front and against the running byte
+    count, so oversized uploads are rejected without reading the rest.
+    The bytes are hashed while they are written to a temp file, which is
+    then renamed into place, so identical uploads share one copy.
+    Returns the content hash and whether this request stored the original.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise InvalidImageError("Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise UploadTooLargeError(f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+
+    root = Path(settings.media_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    upload = _UploadParser(options[b"boundary"], field)
+    received = 0
+    tmp = await run_in_threadpool(tempfile.NamedTemporaryFile, dir=root, delete=False)
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+                raise UploadTooLargeError(f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+            upload.parser.write(chunk)
+            if upload.pending:
+                await run_in_threadpool(tmp.write, upload.flush())
+        upload.parser.finalize()
+        await run_in_threadpool(tmp.close)
+        if not upload.found:
+            raise InvalidImageError(f"Missing {field} part")
+    except BaseException:
+        await run_in_threadpool(tmp.close)
+        os.unlink(tmp.name)
+        raise
+
+    digest = upload.sha256.hexdigest()
+    created = await run_in_threadpool(_commit_upload, tmp.name, digest)
+    return digest, created
+
+def generate_thumbnails(original: str, sizes: tuple[int, ...]):
+    """Validate an image and write square WebP thumbnails next to it (runs in a worker process)"""
+    try:
+        with Image.open(original) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise InvalidImageError(f"Unsupported image format: {image.format}")
+            # Decode everything now, so truncated or corrupt data fails here
+            image.load()
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        # Pillow's messages include the storage path, so keep them out of the response
+        raise InvalidImageError("Unrecognized or oversized image data")
+
+    for size in sizes:
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        target = Path(original).with_name(f"{size}.webp")
+        # Unique temp name, since identical uploads may render concurrently
+        tmp = target.with_name(f"{size}.{uuid4().hex}.tmp")
+        try:
+            thumbnail.save(tmp, "WEBP", quality=85)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+def _has_thumbnails(directory: Path):
+    return all((directory / f"{size}.webp").exists() for size in THUMBNAIL_SIZES)
+
+def _discard_original(directory: Path):
+    (directory / "original").unlink(missing_ok=True)
+    for size in THUMBNAIL_SIZES:
+        (directory / f"{size}.webp").unlink(missing_ok=True)
+    try:
+        directory.rmdir()
+    except OSError:
+        pass
+
+async def save_image_upload(request: Request):
+    """Store an uploaded image and its thumbnails, returning its content hash"""
+    digest, created = await receive_upload(request)
+    directory = media_dir(digest)
+    if _has_thumbnails(directory):
+        return digest
+
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(
+            get_process_pool(), generate_thumbnails, str(directory / "original"), THUMBNAIL_SIZES
+        )
+    except BaseException as e:
+        # Invalid bytes are invalid for every request that sends them, so any
+        # copy goes; on other failures only remove what this request stored
+        if created or isinstance(e, InvalidImageError):
+            await run_in_threadpool(_discard_original, directory)
+        raise
+    return digest
+
+def get_variant_path(digest: str, variant: str):
+    """Resolve a stored variant ("original" or a thumbnail size), or None"""
+    if not _DIGEST_PATTERN.match(digest):
+        return None
+    if variant == "original":
+        # Originals are only served once they have been validated
+        if not _has_thumbnails(media_dir(digest)):
+            return None
+        path = media_dir(digest) / "original"
+    elif variant.isdigit() and int(variant) in THUMBNAIL_SIZES:
+        path = media_dir(digest) / f"{variant}.webp"
+    else:
+        return None
+    return path if path.is_file() else None
+
+def get_variant_media_type(path: Path):
+    """Content type of a stored variant, sniffed from its header for originals"""
+    if path.suffix == ".webp":
+        return "image/webp"
+    with open(path, "rb") as f:
+        header = f.read(12)
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG"):
+        return "image/png"
+    if header.startswith(b"GIF8"):
+        return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+def variant_urls(digest: str):
+    """Public URLs of every variant of an upload"""
+    urls = {"original": f"/api/v1/media/{digest}/original"}
+    for size in THUMBNAIL_SIZES:
+        urls[str(size)] = f"/api/v1/media/{digest}/{size}"
+    return urls
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from src.config import settings
+from src.core.logging import logger
+
+LOCAL_EMBEDDING_DIM = 512
+GEMINI_EMBEDDING_DIM = 768
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def local_embedding(text: str, dim: int = LOCAL_EMBEDDING_DIM) -> np.ndarray:
+    """
+    Deterministic offline embedding from hashed word and character n-grams.
+
+    Character trigrams let variants like "next" and "nextjs" overlap. Uses
+    crc32 rather than hash() so vectors are stable across processes. This is
+    purely lexical, so it suits tests and offline use; production matching
+    should use the Gemini backend.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        features = [f"w:{word}"]
+        padded = f"#{word}#"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        for feature in features:
+            h = zlib.crc32(feature.encode())
+            vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def gemini_embedding(text: str) -> np.ndarray:
+    """Embedding from the Gemini API, for production-quality matching"""
+    from src.utils.llm import client
+
+    response = client.models.embed_content(model="text-embedding-004", contents=text)
+    vector = np.asarray(response.embeddings[0].values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+# Embedding backends by name, with the vector size each produces
+EMBEDDINGS = {
+    "local": (local_embedding, LOCAL_EMBEDDING_DIM),
+    "gemini": (gemini_embedding, GEMINI_EMBEDDING_DIM),
+}
+
+
+class SemanticCache:
+    """
+    Cache keyed by prompt meaning rather than exact text.
+
+    Normalized prompt vectors live in one preallocated float32 matrix, so a
+    lookup is a single matrix-vector product plus a partial sort. Hits at or
+    above `threshold` cosine similarity are returned; when full, the least
+    recently used entry is overwritten in place.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        embed: Callable[[str], np.ndarray] = local_embedding,
+        dim: int = LOCAL_EMBEDDING_DIM,
+        capacity: int = 1024,
+        threshold: float = 0.9,
+        directory: str | None = None,
+    ):
+        self.name = name
+        self.embed = embed
+        self.capacity = capacity
+        self.threshold = threshold
+        self.path = Path(directory) / f"{name}.npz" if directory else None
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._prompts: list[str] = []
+        self._values: list = []
+        self._slots: dict[str, int] = {}
+        self._clock = 0
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self):
+        return len(self._prompts)
+
+    def _embed(self, prompt: str):
+        # A failing embedding backend should cost a cache miss, not the request
+        try:
+            return self.embed(prompt)
+        except Exception:
+            logger.exception("semantic cache embedding failed", extra={"cache": self.name})
+            return None
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    def search(self, prompt: str, k: int = 1):
+        """Top-k cached entries by cosine similarity, as (prompt, score, value) tuples"""
+        vector = self._embed(prompt)
+        with self._lock:
+            size = len(self._prompts)
+            if size == 0 or vector is None:
+                return []
+            scores = self._vectors[:size] @ vector
+            k = min(k, size)
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(self._prompts[i], float(scores[i]), self._values[i]) for i in top]
+
+    def get(self, prompt: str, accept: Callable[[str], bool] | None = None):
+        """
+        Cached value for the most similar prompt above the threshold.
+
+        Returns (value, vector); value is None on a miss, and the vector can
+        be handed to put() so a miss only embeds the prompt once. `accept`
+        can veto a hit based on the cached prompt's text.
+        """
+        vector = self._embed(prompt)
+        with self._lock:
+            size = len(self._prompts)
+            if size == 0 or vector is None:
+                return None, vector
+            scores = self._vectors[:size] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold or (accept and not accept(self._prompts[best])):
+                return None, vector
+            self._touch(best)
+            return self._values[best], vector
+
+    def put(self, prompt: str, value, vector: np.ndarray | None):
+        """Cache a value under the vector get() returned, evicting the least recently used entry when full"""
+        if vector is None:
+            return
+        with self._lock:
+            slot = self._slots.get(prompt)
+            if slot is None and len(self._prompts) < self.capacity:
+                slot = len(self._prompts)
+                self._prompts.append(prompt)
+                self._values.append(value)
+            elif slot is None:
+                slot = int(np.argmin(self._last_used))
+                del self._slots[self._prompts[slot]]
+                self._prompts[slot] = prompt
+                self._values[slot] = value
+            else:
+                self._values[slot] = value
+
+            self._slots[prompt] = slot
+            self._vectors[slot] = vector
+            self._touch(slot)
+
+    def _read_snapshot(self):
+        """(vectors, last_used, entries) from the snapshot file, or None if it doesn't fit this cache"""
+        with np.load(self.path) as data:
+            vectors = data["vectors"]
+            last_used = data["last_used"]
+            entries = json.loads(str(data["entries"]))
+        if vectors.ndim != 2 or vectors.shape[1] != self._vectors.shape[1]:
+            logger.warning("discarding semantic cache snapshot", extra={"cache": self.name})
+            return None
+        return vectors, last_used, entries
+
+    def save(self):
+        """
+        Persist the cache to disk, replacing any previous snapshot atomically.
+
+        Persistence is per worker and best effort. Entries another worker
+        already saved are kept while there is room, behind this worker's own,
+        so workers sharing a directory don't overwrite each other outright.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            size = len(self._prompts)
+            vectors = self._vectors[:size].copy()
+            last_used = self._last_used[:size].copy()
+            prompts = list(self._prompts)
+            values = list(self._values)
+
+        snapshot = self._read_snapshot() if self.path.exists() else None
+        if snapshot:
+            other_vectors, _, entries = snapshot
+            own = set(prompts)
+            extra = [i for i, prompt in enumerate(entries["prompts"]) if prompt not in own]
+            extra = extra[:self.capacity - size]
+            if extra:
+                vectors = np.concatenate([vectors, other_vectors[extra]])
+                # Their use counts come from another process's clock, so rank them last
+                last_used = np.concatenate([last_used, np.zeros(len(extra), dtype=np.int64)])
+                prompts += [entries["prompts"][i] for i in extra]
+                values += [entries["values"][i] for i in extra]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp,
+            vectors=vectors,
+            last_used=last_used,
+            entries=np.array(json.dumps({"prompts": prompts, "values": values})),
+        )
+        os.replace(tmp, self.path)
+
+    def load(self):
+        """Restore a snapshot written by save(), skipping it if the embedding changed"""
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            return
+        vectors, last_used, entries = snapshot
+
+        # Keep the most recently used entries if the capacity shrank
+        keep = np.argsort(last_used, kind="stable")[::-1][:self.capacity]
+        self._vectors[:len(keep)] = vectors[keep]
+        self._last_used[:len(keep)] = last_used[keep]
+        self._prompts = [entries["prompts"][i] for i in keep]
+        self._values = [entries["values"][i] for i in keep]
+        self._slots = {prompt: slot for slot, prompt in enumerate(self._prompts)}
+        self._clock = int(last_used.max()) if len(last_used) else 0
+
+
+def _build_cache(name: str):
+    embed, dim = EMBEDDINGS[settings.embedding_backend]
+    return SemanticCache(
+        name,
+        embed=embed,
+        dim=dim,
+        capacity=settings.semantic_cache_size,
+        threshold=settings.semantic_cache_threshold,
+        directory=settings.semantic_cache_dir or None,
+    )
+
+# Separate caches, since the same prompt maps to different kinds of answers
+chat_cache = _build_cache("chat")
+template_cache = _build_cache("template")
+
+def save_caches():
+    """Persist every cache, if a cache directory is configured"""
+    for cache in (chat_cache, template_cache):
+        cache.save()
+
+async def autosave_caches(interval: float):
+    """Save every cache on an interval, so a crash loses at most one interval of entries"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(save_caches)
+        except Exception:
+            logger.exception("saving semantic caches failed")
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import posixpath
+from functools import lru_cache
+from pathlib import Path
+
+from sqlmodel import Session
+
+from src.core.exceptions import WorkspaceConflictError, WorkspaceEditError
+from src.crud.project import get_blob_contents, get_project_file, get_project_files, save_project_changes
+from src.models.projects import Project
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+def hash_content(content: str):
+    """Content hash shared by template files and stored blobs"""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def available_templates():
+    """Names of the bundled project templates"""
+    return sorted(path.stem for path in TEMPLATES_DIR.glob("*.json"))
+
+@lru_cache(maxsize=None)
+def load_template(name: str):
+    """
+    Load a bundled template with per-file content hashes.
+
+    Cached for the life of the process, since templates ship with the code.
+    Returns None for unknown names.
+    """
+    if name not in available_templates():
+        return None
+    with open(TEMPLATES_DIR / f"{name}.json", "r") as f:
+        document = json.load(f)
+    files = document["template"]["files"]
+    return {
+        "document": document,
+        "files": files,
+        "hashes": {path: hash_content(content) for path, content in files.items()},
+        "sizes": {path: len(content.encode()) for path, content in files.items()},
+    }
+
+def normalize_path(path: str):
+    """Validate a project-relative file path"""
+    normalized = posixpath.normpath(path.strip().removeprefix("./"))
+    if not path.strip() or normalized.startswith(("/", "..")) or normalized == ".":
+        raise WorkspaceEditError(f"Invalid file path: {path}")
+    return normalized
+
+def get_tree(project: Project, session: Session):
+    """
+    List every file in the project's current tree with its hash and size.
+
+    Only reads the changed-file rows; template entries come from memory and
+    no file content is loaded.
+    """
+    template = load_template(project.template)
+    tree = {
+        path: {"path": path, "hash": template["hashes"][path], "size": template["sizes"][path]}
+        for path in template["files"]
+    }
+    for project_file in get_project_files(project.id, session):
+        if project_file.blob_hash is None:
+            tree.pop(project_file.path, None)
+        else:
+            tree[project_file.path] = {
+                "path": project_file.path,
+                "hash": project_file.blob_hash,
+                "size": project_file.size,
+            }
+    return [tree[path] for path in sorted(tree)]
+
+def get_file_hash(project: Project, path: str, session: Session):
+    """Current content hash of a file, or None if it isn't in the tree"""
+    project_file = get_project_file(project.id, path, session)
+    if project_file:
+        return project_file.blob_hash
+    return load_template(project.template)["hashes"].get(path)
+
+def read_file(project: Project, path: str, file_hash: str, session: Session):
+    """Content of a file whose current hash is already known"""
+    template = load_template(project.template)
+    if template["hashes"].get(path) == file_hash:
+        return template["files"][path]
+    return get_blob_contents([file_hash], session)[file_hash]
+
+def get_changes(project: Project, session: Session):
+    """Files that differ from the template, with content; deleted files have none"""
+    project_files = get_project_files(project.id, session)
+    contents = get_blob_contents([f.blob_hash for f in project_files if f.blob_hash], session)
+    return [
+        {
+            "path": f.path,
+            "hash": f.blob_hash,
+            "content": contents.get(f.blob_hash) if f.blob_hash else None,
+        }
+        for f in sorted(project_files, key=lambda f: f.path)
+    ]
+
+def apply_edits(project: Project, edits: list, session: Session, base_version: int | None = None):
+    """
+    Apply a batch of model edits to the project as one new version.
+
+    Each edit either writes full content, deletes the file, or applies
+    search/replace pairs to the current content. Files that end up identical
+    to the template are stored as no change at all. Without a base_version
+    the edits apply to the version read here, so replacements computed from
+    content that changes concurrently are still rejected.
+    """
+    expected_version = project.version if base_version is None else base_version
+    template = load_template(project.template)
+    # Working copy of content for paths touched in this batch
+    pending: dict[str, str | None] = {}
+
+    def current_content(path: str):
+        if path in pending:
+            return pending[path]
+        file_hash = get_file_hash(project, path, session)
+        if file_hash is None:
+            return None
+        return read_file(project, path, file_hash, session)
+
+    for edit in edits:
+        path = normalize_path(edit.path)
+        if edit.delete:
+            if current_content(path) is None:
+                raise WorkspaceEditError(f"File not found: {path}")
+            pending[path] = None
+        elif edit.content is not None:
+            pending[path] = edit.content
+        else:
+            content = current_content(path)
+            if content is None:
+                raise WorkspaceEditError(f"File not found: {path}")
+            for replacement in edit.replacements:
+                if replacement.search not in content:
+                    raise WorkspaceEditError(f"Search text not found in {path}")
+                content = content.replace(replacement.search, replacement.replace, 1)
+            pending[path] = content
+
+    changes = {}
+    for path, content in pending.items():
+        template_hash = template["hashes"].get(path)
+        if content is None:
+            # Deleting a template file needs a marker; deleting an added file needs nothing
+            changes[path] = (None, None, 0) if template_hash else None
+            continue
+        content_hash = hash_content(content)
+        if content_hash == template_hash:
+            changes[path] = None
+        else:
+            changes[path] = (content_hash, content, len(content.encode()))
+
+    saved = save_project_changes(project, changes, expected_version, session)
+    if saved is None:
+        raise WorkspaceConflictError(
+            f"Project is at version {project.version}, edits were made against {expected_version}"
+        )
+    return saved